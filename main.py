@@ -3,6 +3,7 @@ import random
 from os import path
 
 from highscores import HighscoreDB
+from recorder import FrameRecorder
 from settings import (
     WIDTH,
     HEIGHT,
@@ -20,6 +21,10 @@ from settings import (
     WHITE,
     YELLOW,
     BLACK,
+    CAPTURE_SECONDS,
+    CAPTURE_FORMAT,
+    CAPTURE_DIR,
+    CAPTURE_COPY_BUDGET_MS,
 )
 from sprites import Player, Platform, Cloud, InputBox, FlyingMob, load_cloud_sprites
 
@@ -46,6 +51,14 @@ class Game:
         self.state = GameState.MENU
 
         self.db = HighscoreDB()
+        self.recorder = FrameRecorder(
+            self.screen,
+            CAPTURE_SECONDS,
+            FPS,
+            path.join(path.dirname(__file__), CAPTURE_DIR),
+            CAPTURE_FORMAT,
+            CAPTURE_COPY_BUDGET_MS,
+        )
 
         self.load_assets()
         self.reset()
@@ -96,6 +109,7 @@ class Game:
             self.update()
             self.draw()
 
+        self.recorder.close()
         pg.quit()
 
     def handle_events(self):
@@ -104,6 +118,14 @@ class Game:
                 self.running = False
                 return
 
+            # F9 toggles capture, F10 saves the last CAPTURE_SECONDS of gameplay
+            if event.type in (pg.KEYDOWN, pg.KEYUP) and event.key in (pg.K_F9, pg.K_F10):
+                if event.type == pg.KEYDOWN and event.key == pg.K_F9:
+                    self.recorder.toggle()
+                elif event.type == pg.KEYDOWN and event.key == pg.K_F10:
+                    self.recorder.dump()
+                continue
+
             if self.state == GameState.PLAYING:
                 self.handle_playing_events(event)
             elif self.state == GameState.GAME_OVER:
@@ -235,6 +257,7 @@ class Game:
         elif self.state == GameState.GAME_OVER:
             self.draw_game_over()
 
+        self.recorder.capture()
         display.flip()
 
     def draw_playing(self):
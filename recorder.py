@@ -0,0 +1,266 @@
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from os import makedirs, path
+from typing import Optional
+
+import pygame as pg
+
+Frame = bytearray
+Ring = list[Frame]
+
+# Byte offsets of red, green and blue inside a 32-bit pixel for each raw pixel format
+CHANNEL_OFFSETS: dict[str, tuple[int, int, int]] = {
+    "bgra": (2, 1, 0),
+    "bgr0": (2, 1, 0),
+    "rgba": (0, 1, 2),
+    "rgb0": (0, 1, 2),
+}
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(frame: Frame, width: int, height: int, pix_fmt: str) -> bytes:
+    """Encodes a 32-bit frame as an RGB PNG, the compression runs in zlib without holding the GIL."""
+    (r, g, b) = CHANNEL_OFFSETS[pix_fmt]
+    rgb = bytearray(width * height * 3)
+    rgb[0::3] = frame[r::4]
+    rgb[1::3] = frame[g::4]
+    rgb[2::3] = frame[b::4]
+    stride = width * 3
+    scanlines = b"".join(b"\x00" + rgb[y * stride : (y + 1) * stride] for y in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(scanlines)) + png_chunk(b"IEND", b"")
+
+
+class FrameRecorder:
+    """Keeps the last few seconds of rendered frames in memory and saves them on demand.
+
+    Two rings are allocated when capture is turned on, so the game thread only copies
+    the raw pixel buffer of the screen into an existing slot. A dump lends the filled
+    ring to a worker thread and recording carries on into the spare one, which the
+    worker hands back once the frames are encoded. Each copy is timed against
+    budget_ms, and the frame time of the game loop is tracked separately while a save
+    runs so the cost of sharing the GIL with the worker shows up in the output too.
+    Frames in a known 32-bit layout are encoded without building a Surface, so most
+    of the worker's time is spent in zlib and file writes which release the GIL.
+    """
+
+    def __init__(self, surface: pg.Surface, seconds: int, fps: int, out_dir: str, fmt: str = "png", budget_ms: float = 2.0):
+        if fmt not in ("png", "raw"):
+            raise ValueError(f"Unknown capture format: {fmt}")
+        self.surface = surface
+        self.fps = fps
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.budget_ns = int(budget_ms * 1e6)
+        self.enabled = False
+
+        self.size = surface.get_size()
+        self.bitsize = surface.get_bitsize()
+        self.masks = surface.get_masks()
+        self.frame_bytes = surface.get_pitch() * surface.get_height()
+        self.pix_fmt = self.raw_pix_fmt(surface)
+
+        self.capacity = seconds * fps
+        self.ring: Optional[Ring] = None
+        self.spare: Optional[Ring] = None
+        self.head = 0
+        self.count = 0
+        self.pending = False
+        self.dumps = 0
+        self.reset_stats()
+
+        self.jobs: queue.Queue[Optional[tuple[str, Ring, Ring]]] = queue.Queue(maxsize=1)
+        self.returned: queue.Queue[Ring] = queue.Queue(maxsize=1)
+        self.worker = threading.Thread(target=self.encode_loop, name="frame-recorder", daemon=True)
+        self.worker.start()
+
+    @staticmethod
+    def raw_pix_fmt(surface: pg.Surface) -> Optional[str]:
+        """ffmpeg pixel format matching the surface memory, if frames can be written as they are."""
+        (width, height) = surface.get_size()
+        if surface.get_bitsize() != 32 or surface.get_pitch() != width * 4 or sys.byteorder != "little":
+            return None
+        (r, g, b, a) = surface.get_masks()
+        if (r, g, b) == (0xFF0000, 0xFF00, 0xFF):
+            return "bgra" if a == 0xFF000000 else "bgr0"
+        if (r, g, b) == (0xFF, 0xFF00, 0xFF0000):
+            return "rgba" if a == 0xFF000000 else "rgb0"
+        return None
+
+    def reset_stats(self) -> None:
+        self.copy_last_ns = 0
+        self.copy_max_ns = 0
+        self.copy_total_ns = 0
+        self.copy_frames = 0
+        self.copy_over_budget = 0
+        self.reset_frame_stats()
+
+    def reset_frame_stats(self) -> None:
+        self.frame_prev_ns = 0
+        self.frame_max_ns = 0
+        self.frame_total_ns = 0
+        self.frames = 0
+
+    def ring_mib(self) -> float:
+        return self.capacity * self.frame_bytes / 2**20
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.head = 0
+        self.count = 0
+        if self.enabled:
+            self.reclaim()
+            if self.ring is None:
+                self.ring = [bytearray(self.frame_bytes) for _ in range(self.capacity)]
+            if self.spare is None and not self.pending:
+                self.spare = [bytearray(self.frame_bytes) for _ in range(self.capacity)]
+            self.reset_stats()
+            print(f"Capture enabled, holding 2 rings of {self.capacity} frames ({2 * self.ring_mib():.0f} MiB)")
+        else:
+            # Release the frames while not recording, a ring still being saved is dropped once it comes back
+            self.ring = None
+            self.spare = None
+            print("Capture disabled")
+
+    def reclaim(self) -> bool:
+        if not self.pending:
+            return True
+        try:
+            ring = self.returned.get_nowait()
+        except queue.Empty:
+            return False
+        self.pending = False
+        self.spare = ring if self.enabled else None
+        if self.frames:
+            avg_ms = self.frame_total_ns / self.frames / 1e6
+            print(f"Capture saved, frame time while saving avg {avg_ms:.1f}ms, max {self.frame_max_ns / 1e6:.1f}ms (target {1000 / self.fps:.1f}ms)")
+        self.reset_frame_stats()
+        return True
+
+    def capture(self) -> None:
+        if not self.enabled:
+            return
+        self.reclaim()
+
+        start = time.perf_counter_ns()
+        pixels = self.surface.get_buffer()
+        memoryview(self.ring[self.head])[:] = pixels
+        del pixels  # unlocks the surface
+        elapsed = time.perf_counter_ns() - start
+
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        self.copy_last_ns = elapsed
+        self.copy_max_ns = max(self.copy_max_ns, elapsed)
+        self.copy_total_ns += elapsed
+        self.copy_frames += 1
+        if elapsed > self.budget_ns:
+            self.copy_over_budget += 1
+            if self.copy_over_budget == 1:
+                print(f"Warning: frame copy took {elapsed / 1e6:.3f}ms, over the {self.budget_ns / 1e6:.3f}ms budget")
+
+        # Time between captures is the game's frame time, only tracked while the worker competes for the GIL
+        if self.pending:
+            if self.frame_prev_ns:
+                frame_ns = start - self.frame_prev_ns
+                self.frame_max_ns = max(self.frame_max_ns, frame_ns)
+                self.frame_total_ns += frame_ns
+                self.frames += 1
+            self.frame_prev_ns = start
+
+    def dump(self) -> Optional[str]:
+        if not self.enabled:
+            print("Nothing to dump, capture is disabled (press F9)")
+            return None
+        if not self.reclaim():
+            print("Still saving the previous capture, recording continues, try again shortly")
+            return None
+        if self.count == 0:
+            print("Nothing to dump yet")
+            return None
+
+        start = (self.head - self.count) % self.capacity
+        frames = [self.ring[(start + i) % self.capacity] for i in range(self.count)]
+
+        self.dumps += 1
+        target = path.join(self.out_dir, f"capture-{time.strftime('%Y%m%d-%H%M%S')}-{self.dumps:03d}")
+        self.jobs.put_nowait((target, frames, self.ring))
+        self.pending = True
+        (self.ring, self.spare) = (self.spare, None)
+        self.head = 0
+        self.count = 0
+
+        print(f"Dumping {len(frames)} frames to {target}, recording continues ({self.stats()})")
+        self.reset_stats()
+        return target
+
+    def stats(self) -> str:
+        if self.copy_frames == 0:
+            return "no frames copied"
+        avg_ms = self.copy_total_ns / self.copy_frames / 1e6
+        return (
+            f"copy avg {avg_ms:.3f}ms, max {self.copy_max_ns / 1e6:.3f}ms, last {self.copy_last_ns / 1e6:.3f}ms, "
+            f"{self.copy_over_budget}/{self.copy_frames} over {self.budget_ns / 1e6:.3f}ms budget"
+        )
+
+    def encode_loop(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            target, frames, ring = job
+            try:
+                if self.fmt == "png":
+                    self.write_png_sequence(target, frames)
+                else:
+                    self.write_raw_video(target, frames)
+                print(f"Saved {len(frames)} frames to {target}")
+            except Exception as e:
+                print(f"Error saving capture: {e}")
+            finally:
+                self.returned.put(ring)
+                self.jobs.task_done()
+
+    def to_surface(self, frame: Frame) -> pg.Surface:
+        surface = pg.Surface(self.size, 0, self.bitsize, self.masks)
+        pixels = surface.get_buffer()
+        memoryview(pixels)[:] = frame
+        del pixels
+        return surface
+
+    def write_png_sequence(self, target: str, frames: Ring) -> None:
+        makedirs(path.dirname(target) or ".", exist_ok=True)
+        makedirs(target)  # raises if the capture already exists instead of overwriting it
+        (width, height) = self.size
+        for i, frame in enumerate(frames):
+            filename = path.join(target, f"frame_{i:05d}.png")
+            if self.pix_fmt:
+                with open(filename, "xb") as f:
+                    f.write(encode_png(frame, width, height, self.pix_fmt))
+            else:
+                pg.image.save(self.to_surface(frame), filename)
+
+    def write_raw_video(self, target: str, frames: Ring) -> None:
+        # Plays back with: ffmpeg -f rawvideo -pix_fmt <pix_fmt> -s WxH -r FPS -i <file> out.mp4
+        makedirs(path.dirname(target) or ".", exist_ok=True)
+        (width, height) = self.size
+        pix_fmt = self.pix_fmt or "rgb24"
+        with open(f"{target}_{width}x{height}_{self.fps}fps_{pix_fmt}.raw", "xb") as f:
+            for frame in frames:
+                # Frames already in an ffmpeg pixel format go straight to disk, the write releases the GIL
+                f.write(frame if self.pix_fmt else pg.image.tobytes(self.to_surface(frame), "RGB"))
+
+    def close(self) -> None:
+        if not self.reclaim():
+            print("Flushing pending capture to disk...")
+        self.jobs.put(None)
+        self.worker.join()
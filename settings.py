@@ -33,3 +33,8 @@ PLATFORM_LIST: list[tuple[int, int]] = [
     (200, HEIGHT * 1 / 4 - 200),  # -50
 ]
 BOOST_POWER: int = 40
+# F9 allocates two rings of CAPTURE_SECONDS * FPS frames at 4 bytes per pixel, about 440 MiB for 3s at 800x600
+CAPTURE_SECONDS: int = 3
+CAPTURE_FORMAT: str = "png"  # "png" for an image sequence, "raw" for a single video file in the screen's pixel format
+CAPTURE_DIR: str = "captures"
+CAPTURE_COPY_BUDGET_MS: float = 2.0  # warn when copying a frame costs more than this on the game thread
@@ -0,0 +1,128 @@
+import os
+import threading
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg
+import pytest
+
+from recorder import FrameRecorder
+
+WIDTH, HEIGHT = 64, 48
+FPS = 10
+
+
+@pytest.fixture
+def screen():
+    pg.init()
+    yield pg.display.set_mode((WIDTH, HEIGHT))
+    pg.quit()
+
+
+def color(i: int) -> tuple[int, int, int]:
+    return (i * 10 % 256, 255 - i * 10 % 256, i % 256)
+
+
+def record(recorder: FrameRecorder, screen: pg.Surface, start: int, n: int) -> None:
+    for i in range(start, start + n):
+        screen.fill(color(i))
+        recorder.capture()
+
+
+@pytest.mark.parametrize("fmt", ["png", "raw"])
+def test_dump_keeps_last_frames_in_order(screen, tmp_path, fmt):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path), fmt)
+    recorder.toggle()
+    record(recorder, screen, 0, FPS + 5)  # wraps around the ring
+    target = recorder.dump()
+    recorder.close()
+
+    if fmt == "png":
+        files = sorted(os.listdir(target))
+        assert len(files) == FPS
+        for n, name in enumerate(files):
+            assert pg.image.load(path.join(target, name)).get_at((0, 0))[:3] == color(n + 5)
+    else:
+        assert recorder.pix_fmt == "bgr0"
+        filename = f"{target}_{WIDTH}x{HEIGHT}_{FPS}fps_bgr0.raw"
+        frame_size = WIDTH * HEIGHT * 4
+        with open(filename, "rb") as f:
+            data = f.read()
+        assert len(data) == FPS * frame_size
+        for n in range(FPS):
+            (b, g, r) = data[n * frame_size : n * frame_size + 3]
+            assert (r, g, b) == color(n + 5)
+
+
+@pytest.mark.parametrize("fmt", ["png", "raw"])
+def test_consecutive_dumps_do_not_overwrite(screen, tmp_path, fmt):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path), fmt)
+    recorder.toggle()
+    record(recorder, screen, 0, FPS)
+    first = recorder.dump()
+    recorder.jobs.join()
+    record(recorder, screen, 0, 3)
+    second = recorder.dump()
+    recorder.close()
+
+    assert first != second
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_recording_continues_while_saving(screen, tmp_path, monkeypatch):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path))
+    saving = threading.Event()
+    monkeypatch.setattr(recorder, "write_png_sequence", lambda target, frames: saving.wait())
+    recorder.toggle()
+    record(recorder, screen, 0, FPS)
+    assert recorder.dump() is not None
+
+    record(recorder, screen, 0, 4)  # goes into the spare ring
+    assert recorder.count == 4
+    assert recorder.dump() is None  # refused until the first save is done
+
+    saving.set()
+    recorder.jobs.join()
+    assert recorder.dump() is not None
+    recorder.close()
+
+
+def test_worker_survives_encode_errors(screen, tmp_path, monkeypatch):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path))
+
+    def fail(target, frames):
+        raise ValueError("broken frame")
+
+    monkeypatch.setattr(recorder, "write_png_sequence", fail)
+    recorder.toggle()
+    record(recorder, screen, 0, 3)
+    assert recorder.dump() is not None
+    recorder.jobs.join()
+
+    assert recorder.worker.is_alive()
+    record(recorder, screen, 0, 3)
+    assert recorder.dump() is not None
+    recorder.close()
+    assert recorder.reclaim()
+
+
+def test_dump_without_frames(screen, tmp_path):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path))
+    assert recorder.dump() is None  # disabled
+    recorder.toggle()
+    assert recorder.dump() is None  # nothing captured yet
+    recorder.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_toggle_resets_stats(screen, tmp_path):
+    recorder = FrameRecorder(screen, 1, FPS, str(tmp_path))
+    recorder.toggle()
+    record(recorder, screen, 0, 3)
+    assert recorder.copy_frames == 3
+    recorder.toggle()
+    recorder.toggle()
+    assert recorder.copy_frames == 0
+    assert recorder.stats() == "no frames copied"
+    recorder.close()